@@ -12,24 +12,115 @@ import os
 import sys
 import pygame
 import json
-import random
+import logging
 import math
+import random
 import re
+import queue
+import threading
+import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pygame.locals import *
 
-# Initialize pygame
-pygame.init()
-pygame.font.init()
+try:
+    import orjson  # Much faster JSON encoding/decoding when available
+except ImportError:
+    orjson = None
+
+# Per-tile and per-event diagnostics are logged at DEBUG so they cost
+# nothing unless explicitly enabled
+log = logging.getLogger(__name__)
+log.setLevel(logging.INFO)
 
 # Constants
 SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
 SIDEBAR_WIDTH = 300
 TILE_SIZE = 32
+# TILE_SIZE as a bit shift when it is a power of two, else None
+TILE_SHIFT = TILE_SIZE.bit_length() - 1 if TILE_SIZE & (TILE_SIZE - 1) == 0 else None
 FPS = 60
 GRID_COLOR = (100, 100, 100, 100)
 BACKGROUND_COLOR = (40, 40, 40)
 
+# Path keywords that suggest an asset's category, in priority order
+CATEGORY_KEYWORDS = [
+    ("terrain", ["tile", "terrain", "ground"]),
+    ("vegetation", ["tree", "bush", "plant", "nature"]),
+    ("buildings", ["build", "house", "structure"]),
+    ("npcs", ["character", "npc", "people"]),
+    ("decorations", ["item", "prop", "decoration"])
+]
+
+# Image files picked up by the asset scan
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.PNG', '.JPG')
+
+# Paths that are definitely tilesets and should be sliced, matched against
+# the lowercased path
+TILESET_PATHS = ["tilesets", "tileset", "tiles", "walls", "market_stalls"]
+
+# Maps up to this many pixels pre-render their layers into map-sized surfaces;
+# larger maps draw only the visible tiles each frame instead
+MAX_CACHED_MAP_PIXELS = 2048 * 2048
+
+# Size of the tile previews in the sidebar, scaled once when a texture is loaded
+SIDEBAR_PREVIEW_SIZE = 36
+
+# Decoded assets registered per frame while loading (keeps the editor responsive)
+ASSET_LOADS_PER_FRAME = 4
+
+# Decoded assets waiting to be registered; the scan pauses when this many are queued
+ASSET_QUEUE_SIZE = 16
+
+# Map file metadata is JSON; the layer grids are stored alongside in a .npz
+def dump_json(data, pretty=True):
+    """Encode data as JSON bytes, indented if pretty, otherwise as compact as possible"""
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(data, indent=2).encode("utf-8")
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+def load_json(raw):
+    """Decode JSON from bytes"""
+    if orjson:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+# pygame-ce provides Surface.fblits, a faster blits() without per-item options
+HAS_FBLITS = hasattr(pygame.Surface, "fblits")
+
+def blit_batch(surface, batch):
+    """Blit a list of (source, position) pairs onto a surface in one call"""
+    if HAS_FBLITS:
+        surface.fblits(batch)
+    else:
+        surface.blits(batch, doreturn=False)
+
+class TileType:
+    """A placeable tile type, shared by every map cell that uses it
+    Field names match the keys used for tiles in map files.
+    """
+    __slots__ = ("type", "source_category", "path", "is_sliced", "tileset_index")
+    
+    def __init__(self, type, source_category=None, path=None, is_sliced=None, tileset_index=None):
+        self.type = type
+        self.source_category = source_category
+        self.path = path
+        self.is_sliced = is_sliced
+        self.tileset_index = tileset_index
+    
+    @classmethod
+    def from_dict(cls, tile_data):
+        """Build a tile type from a saved tile entry, ignoring position fields"""
+        return cls(**{name: tile_data[name] for name in cls.__slots__ if name in tile_data})
+    
+    def to_dict(self):
+        """Return the fields that are set, as saved in map files"""
+        return {name: getattr(self, name) for name in self.__slots__ if getattr(self, name) is not None}
+
+
 class StandaloneMapEditor:
     """Standalone map editor that doesn't rely on importing Trading Legends modules"""
     
@@ -63,6 +154,10 @@ class StandaloneMapEditor:
         self.selected_tile = "grass"
         self.selected_tile_data = None  # Store the actual texture data of selected tile
         
+        # Parts of the screen that need redrawing on the next frame
+        self._map_dirty = True  # Redraws everything
+        self._sidebar_dirty = True
+        
         # Sidebar scroll state
         self.sidebar_scroll = 0
         self.sidebar_scroll_max = 0
@@ -73,9 +168,22 @@ class StandaloneMapEditor:
         # Asset groups - store groups of related assets
         self.asset_groups = {}
         
+        # Grid lines, drawn once and blitted with the camera offset
+        self._grid_overlay = self._build_grid_overlay()
+        
+        # Translucent outline marking the tiles of the current layer
+        self._highlight_overlay = pygame.Surface((TILE_SIZE, TILE_SIZE), SRCALPHA).convert_alpha()
+        self._highlight_overlay.fill((0, 0, 0, 0))
+        pygame.draw.rect(self._highlight_overlay, (255, 255, 255, 100), self._highlight_overlay.get_rect(), 1)
+        
+        # Checker + ground background, redrawn when the ground texture changes
+        self._bg_surface = None
+        self._bg_ground = None
+        
         # UI elements
         self.font = pygame.font.SysFont(None, 24)
         self.small_font = pygame.font.SysFont(None, 18)
+        self._text_cache = {}  # (font id, text, color) -> rendered text surface
         
         # Define available tile types and colors
         self.categories = {
@@ -119,71 +227,75 @@ class StandaloneMapEditor:
         # Initialize map
         self.initialize_new_map(40, 30)
         
-        # Try to load assets
-        self.textures = self.scan_project_assets()
+        # Load assets in the background; update() registers them as they arrive
+        self.textures = {category: {} for category in self.categories}
+        self._asset_queue = queue.Queue(maxsize=ASSET_QUEUE_SIZE)
+        self._stop_loading = threading.Event()  # Set by run() on exit to end the scan early
+        self.assets_total = 0
+        self.assets_loaded = 0
+        self.loading_assets = True
+        self._scan_thread = threading.Thread(target=self._async_scan, daemon=True)
+        self._scan_thread.start()
         
         print("\n✅ Map Editor initialized successfully!")
         print("Use arrow keys or WASD to navigate")
         print("G to toggle grid, Ctrl+S to save, Ctrl+L to load")
         print("Click on sidebar to select tiles, click on map to place them")
     
-    def slice_tilesheet(self, image, tile_size=32):
-        """Slice a tilesheet into individual tiles
-        Returns a list of pygame surfaces, each representing a tile
+    def detect_tile_size(self, image):
+        """Guess the tile size of a tilesheet
+        Returns None if the image doesn't look like a tileset
         """
-        tiles = []
         width, height = image.get_size()
         
         # Skip tiny images
-        if width < tile_size or height < tile_size:
-            return [image]  # Return the original as a single tile
+        if width < 32 or height < 32:
+            return None
             
         # Handle large single images that might not be tilesets
         if width <= 64 and height <= 64:
-            return [image]  # Likely a single image
-            
-        # For larger images, determine if this is likely a tileset
-        is_tileset = False
+            return None  # Likely a single image
         
         # Check if dimensions are multiples of common tile sizes
         for size in [16, 24, 32, 48, 64]:
             if width % size == 0 and height % size == 0:
-                tile_size = size
-                is_tileset = True
-                break
+                return size
         
-        # If not a clear tileset, return as single image
-        if not is_tileset:
-            return [image]
+        return None
+    
+    def slice_tilesheet(self, image, tile_size=None):
+        """Slice a tilesheet into individual tiles
+        Returns a list of pygame surfaces, each representing a tile.
+        The tile size is detected from the image unless one is given.
+        """
+        tiles = []
+        width, height = image.get_size()
+        
+        if tile_size is None:
+            tile_size = self.detect_tile_size(image)
+            
+            # If not a clear tileset, return as single image
+            if tile_size is None:
+                return [image]
         
         # Slice the tileset into individual tiles
-        print(f"Slicing tileset: {width}x{height} into {tile_size}x{tile_size} tiles")
-        for y in range(0, height, tile_size):
-            for x in range(0, width, tile_size):
-                if x + tile_size <= width and y + tile_size <= height:
-                    # Create a rectangle for this tile
-                    rect = pygame.Rect(x, y, tile_size, tile_size)
-                    
-                    # Extract the tile as a new surface
-                    try:
-                        tile = image.subsurface(rect).copy()
-                        tiles.append(tile)
-                    except ValueError as e:
-                        print(f"Error slicing tile at {x},{y}: {e}")
-        
-        print(f"Extracted {len(tiles)} tiles from tileset")
+        log.debug("Slicing tileset: %dx%d into %dx%d tiles", width, height, tile_size, tile_size)
+        cols, rows = width // tile_size, height // tile_size
+        
+        for y in range(0, rows * tile_size, tile_size):
+            for x in range(0, cols * tile_size, tile_size):
+                # Extract the tile as a new surface
+                tiles.append(image.subsurface((x, y, tile_size, tile_size)).copy())
+        
+        log.debug("Extracted %d tiles from tileset", len(tiles))
         return tiles
     
     def scan_project_assets(self):
-        """Scan the project directory for assets"""
+        """Scan the project directory for assets
+        Returns a list of (filepath, default_category) in processing order
+        """
         print("\n🔍 Scanning for assets...")
         
-        textures = {}
-        
-        # Initialize categories
-        for category in self.categories:
-            textures[category] = {}
-        
         # Define possible asset directories and high-quality paths from memory
         asset_dirs = [
             "asset_packs",
@@ -199,34 +311,34 @@ class StandaloneMapEditor:
             "asset_packs/extracted_assets/mystic_woods_free_2.2/sprites/objects"
         ]
         
-        # Paths that are definitely tilesets and should be sliced
-        tileset_paths = [
-            "Tilesets", "tileset", "tiles", "walls", "Market_Stalls"
-        ]
+        # (filepath, default_category) for every asset to load, in processing order
+        asset_jobs = []
         
-        assets_found = 0
-        sliced_tilesets = 0
+        # Known directories (as "dir/" prefixes) and files handled by the first pass
+        processed_dirs = []
+        processed_files = set()
         
         # First process known high-quality assets
         for asset_path in known_assets:
-            full_path = os.path.join(os.getcwd(), asset_path)
+            full_path = os.path.abspath(asset_path)
             
             # Handle directory paths
             if os.path.isdir(full_path):
+                processed_dirs.append(full_path + os.sep)
                 for root, _, files in os.walk(full_path):
-                    for file in [f for f in files if f.lower().endswith(('.png', '.jpg'))]:                       
-                        filepath = os.path.join(root, file)
-                        self._process_asset_file(filepath, textures, tileset_paths)
-                        assets_found += 1
+                    for file in [f for f in files if f.endswith(IMAGE_EXTENSIONS)]:
+                        asset_jobs.append((os.path.join(root, file), None))
             
             # Handle file paths
-            elif os.path.isfile(full_path) and full_path.lower().endswith(('.png', '.jpg')):
-                self._process_asset_file(full_path, textures, tileset_paths)
-                assets_found += 1
+            elif os.path.isfile(full_path) and full_path.endswith(IMAGE_EXTENSIONS):
+                processed_files.add(full_path)
+                asset_jobs.append((full_path, None))
+        
+        processed_dirs = tuple(processed_dirs)
         
         # Then look for additional assets in standard directories
         for base_dir in asset_dirs:
-            base_path = os.path.join(os.getcwd(), base_dir)
+            base_path = os.path.abspath(base_dir)
             
             if not os.path.exists(base_path):
                 continue
@@ -236,44 +348,152 @@ class StandaloneMapEditor:
             # Walk through directories
             for root, _, files in os.walk(base_path):
                 # Skip already processed directories
-                if any(known in root for known in known_assets if isinstance(known, str) and os.path.isdir(os.path.join(os.getcwd(), known))):
+                if (root + os.sep).startswith(processed_dirs):
                     continue
                     
-                # Only look at png/jpg files
-                image_files = [f for f in files if f.lower().endswith(('.png', '.jpg'))]
+                # Only look at png/jpg files that weren't already processed
+                image_files = [f for f in files
+                               if f.endswith(IMAGE_EXTENSIONS) and os.path.join(root, f) not in processed_files]
                 
                 if not image_files:
                     continue
                 
                 # Try to determine category from path
-                path_lower = root.lower()
-                category = None
-                
-                # Check for category indicators in path
-                if any(kw in path_lower for kw in ["tile", "terrain", "ground"]):
-                    category = "terrain"
-                elif any(kw in path_lower for kw in ["tree", "bush", "plant", "nature"]):
-                    category = "vegetation"
-                elif any(kw in path_lower for kw in ["build", "house", "structure"]):
-                    category = "buildings"
-                elif any(kw in path_lower for kw in ["character", "npc", "people"]):
-                    category = "npcs"
-                elif any(kw in path_lower for kw in ["item", "prop", "decoration"]):
-                    category = "decorations"
+                category = self._classify_path(root.lower())
                 
                 # If we found a category, process the assets
                 if category:
                     # Process a limited number of images per directory
                     for img_file in image_files[:5]:
-                        filepath = os.path.join(root, img_file)
-                        self._process_asset_file(filepath, textures, tileset_paths, category)
-                        assets_found += 1
+                        asset_jobs.append((os.path.join(root, img_file), category))
         
-        print(f"✅ Loaded {assets_found} assets with {sliced_tilesets} sliced tilesets")
-        return textures
+        return asset_jobs
+    
+    def _async_scan(self):
+        """Background thread: find and decode assets, queueing them for the main thread
+        Only decoding happens here (pygame releases the GIL while decoding); converting,
+        scaling and registering need the display and stay on the main thread.
+        Each queued item is (filepath, default_category, image), image being None if it
+        failed to load; a final None marks the end of the scan.
+        """
+        try:
+            asset_jobs = self.scan_project_assets()
+            self.assets_total = len(asset_jobs)
+            
+            # Decode the images in parallel, queueing them in order; only a few are decoded
+            # ahead, so finished images don't pile up in memory waiting for their turn
+            workers = os.cpu_count() or 1
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pending = deque()
+                for filepath, category in asset_jobs:
+                    pending.append((filepath, category, executor.submit(pygame.image.load, filepath)))
+                    if len(pending) > 2 * workers and not self._queue_decoded(*pending.popleft()):
+                        break
+                else:
+                    while pending and self._queue_decoded(*pending.popleft()):
+                        pass
+                
+                if self._stop_loading.is_set():
+                    # The editor is closing; drop the decodes that haven't started
+                    executor.shutdown(wait=False, cancel_futures=True)
+        finally:
+            # Always end the scan, or the editor would wait for assets forever
+            self._queue_asset(None)
+    
+    def _queue_asset(self, item):
+        """Queue an item for the main thread, waiting while the queue is full
+        Returns False, without queueing, once loading has been stopped.
+        """
+        while not self._stop_loading.is_set():
+            try:
+                self._asset_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+    
+    def _queue_decoded(self, filepath, category, image_future):
+        """Wait for a decoded image and queue it for the main thread
+        Returns False once loading has been stopped.
+        """
+        try:
+            image = image_future.result()
+        except (pygame.error, OSError) as e:  # Unsupported, missing or unreadable file
+            log.warning("  ⚠️ Error loading %s: %s", filepath, e)
+            image = None
+        return self._queue_asset((filepath, category, image))
+    
+    def _register_loaded_assets(self):
+        """Register up to ASSET_LOADS_PER_FRAME assets decoded by the background scan"""
+        registered = False
+        for _ in range(ASSET_LOADS_PER_FRAME):
+            try:
+                item = self._asset_queue.get_nowait()
+            except queue.Empty:
+                break
+            
+            # End of the scan
+            if item is None:
+                self.loading_assets = False
+                self._map_dirty = True  # Clear the loading screen
+                print(f"✅ Loaded {self.assets_total} assets")
+                break
+            
+            filepath, category, image = item
+            self.assets_loaded += 1
+            if image is not None:
+                self._process_asset_file(filepath, self.textures, category, image)
+                registered = True
+        
+        # Placed tiles may now have a texture, and sidebar previews may be stale
+        if registered:
+            self._rebuild_texture_table()
+            self._map_dirty = True
+    
+    def _scale_to_tile(self, surface, tile_size=TILE_SIZE):
+        """Scale a surface to tile_size x tile_size, picking the scaler by ratio
+        Whole-number ratios (e.g. 16 or 64 -> 32) use fast nearest-neighbour
+        scaling, which keeps pixel art crisp; other ratios use smoothscale to
+        avoid aliasing.
+        """
+        width, height = surface.get_size()
+        if width == tile_size and height == tile_size:
+            return surface
+        
+        whole_ratio = all(size % tile_size == 0 or tile_size % size == 0 for size in (width, height))
+        if whole_ratio or surface.get_bitsize() < 24:  # smoothscale needs 24/32-bit surfaces
+            return pygame.transform.scale(surface, (tile_size, tile_size))
+        return pygame.transform.smoothscale(surface, (tile_size, tile_size))
     
-    def _process_asset_file(self, filepath, textures, tileset_paths, default_category=None):
-        """Process a single asset file"""
+    def _to_display_format(self, surface):
+        """Convert a surface to the display's pixel format, keeping per-pixel alpha if it has it"""
+        if surface.get_flags() & SRCALPHA:
+            return surface.convert_alpha()
+        return surface.convert()
+    
+    def _classify_path(self, path_lower):
+        """Return the category suggested by keywords in a lowercased path, or None"""
+        # Plain substring checks in priority order; cheaper than any() generators or a regex
+        for category, keywords in CATEGORY_KEYWORDS:
+            for keyword in keywords:
+                if keyword in path_lower:
+                    return category
+        return None
+    
+    def _store_texture(self, tiles, tile_type, texture_info):
+        """Store a texture entry, skipping it if it has no usable surfaces
+        Rendering blits stored entries unchecked.
+        """
+        if not (isinstance(texture_info.get("texture"), pygame.Surface)
+                and isinstance(texture_info.get("sidebar"), pygame.Surface)):
+            log.warning("  ⚠️ Skipping %s (%s): no usable texture", tile_type, texture_info.get("path"))
+            return
+        tiles[tile_type] = texture_info
+    
+    def _process_asset_file(self, filepath, textures, default_category=None, image=None):
+        """Process a single asset file
+        If image is given, it is used as the decoded file instead of loading it
+        """
         try:
             # Determine the basename and filename
             filename = os.path.basename(filepath)
@@ -281,52 +501,70 @@ class StandaloneMapEditor:
             path_lower = filepath.lower()
             
             # Debug sizing
-            print(f"Processing asset: {filename} for TILE_SIZE: {TILE_SIZE}px")
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("Processing asset: %s for TILE_SIZE: %dpx", filename, TILE_SIZE)
             
             # Determine category based on path or default
             category = default_category
             if not category:
-                if any(kw in path_lower for kw in ["tile", "terrain", "ground"]):
-                    category = "terrain"
-                elif any(kw in path_lower for kw in ["tree", "bush", "plant", "nature"]):
-                    category = "vegetation"
-                elif any(kw in path_lower for kw in ["build", "house", "structure"]):
-                    category = "buildings"
-                elif any(kw in path_lower for kw in ["character", "npc", "people"]):
-                    category = "npcs"
-                elif any(kw in path_lower for kw in ["item", "prop", "decoration"]):
-                    category = "decorations"
-                else:
-                    # Default to terrain if no category is found
-                    category = "terrain"
+                # Default to terrain if no category is found
+                category = self._classify_path(path_lower) or "terrain"
             
             try:
                 # Load the original texture
-                orig_texture = pygame.image.load(filepath)
+                if image is not None:
+                    orig_texture = image
+                else:
+                    orig_texture = pygame.image.load(filepath)
                 
                 # Group base name for related tiles (without numbers)
                 base_group_name = re.sub(r'\d+', '', name_without_ext).strip('_')
                 
                 # Determine if this is a tileset that should be sliced
-                is_tileset = any(ts in path_lower for ts in tileset_paths)
+                is_tileset = False
+                for tileset_path in TILESET_PATHS:
+                    if tileset_path in path_lower:
+                        is_tileset = True
+                        break
                 width, height = orig_texture.get_size()
-                print(f"  Original size: {width}x{height}")
+                log.debug("  Original size: %dx%d", width, height)
                 
                 # Images larger than 64x64 are likely tilesets
                 if (width > 64 and height > 64) or is_tileset:
-                    # Slice the tileset
-                    tile_surfaces = self.slice_tilesheet(orig_texture)
+                    src_tile_size = self.detect_tile_size(orig_texture)
+                    if src_tile_size:
+                        if src_tile_size % TILE_SIZE == 0 or TILE_SIZE % src_tile_size == 0:
+                            # Whole-number ratio: scale the whole sheet once so it slices
+                            # straight into TILE_SIZE tiles, as _scale_to_tile would per tile
+                            sheet = orig_texture
+                            if src_tile_size != TILE_SIZE:
+                                sheet_size = (width // src_tile_size * TILE_SIZE, height // src_tile_size * TILE_SIZE)
+                                sheet = pygame.transform.scale(orig_texture, sheet_size)
+                            tile_surfaces = self.slice_tilesheet(sheet, TILE_SIZE)
+                        else:
+                            # Other ratios are sliced at native size and smoothscaled per tile below,
+                            # so neighbouring tiles don't bleed into each other
+                            tile_surfaces = self.slice_tilesheet(orig_texture, src_tile_size)
+                        source_size = (src_tile_size, src_tile_size)
+                    else:
+                        tile_surfaces = [orig_texture]
+                        source_size = (width, height)
+                    
+                    # Scale each tile to match TILE_SIZE if needed and convert it to the
+                    # display format once, so blits never convert pixels
+                    tile_textures = [self._to_display_format(self._scale_to_tile(tile_surface))
+                                     for tile_surface in tile_surfaces]
                     
                     # Create a group for these tiles
                     if base_group_name not in self.asset_groups:
                         self.asset_groups[base_group_name] = {
                             "category": category,
                             "tiles": [],
-                            "preview": tile_surfaces[0] if tile_surfaces else None
+                            "preview": tile_textures[0] if tile_textures else None
                         }
                     
                     # Add each tile as a separate entry
-                    for i, tile_surface in enumerate(tile_surfaces):
+                    for i, tile_texture in enumerate(tile_textures):
                         tile_type = f"{name_without_ext}_{i+1}"
                         
                         # Add this tile to its group
@@ -344,30 +582,25 @@ class StandaloneMapEditor:
                             )
                         
                         # Get original size before scaling
-                        ts_width, ts_height = tile_surface.get_size()
-                        
-                        # Scale the tile to match TILE_SIZE if needed
-                        if ts_width != TILE_SIZE or ts_height != TILE_SIZE:
-                            scaled_tile = pygame.transform.scale(tile_surface, (TILE_SIZE, TILE_SIZE))
-                        else:
-                            scaled_tile = tile_surface
+                        ts_width, ts_height = source_size
                         
                         # Store the tile with group information and original size
-                        textures[category][tile_type] = {
-                            "texture": scaled_tile,
+                        self._store_texture(textures[category], tile_type, {
+                            "texture": tile_texture,
+                            "sidebar": self._scale_to_tile(tile_texture, SIDEBAR_PREVIEW_SIZE),
                             "path": filepath,
                             "tileset_index": i,
                             "is_sliced": True,
                             "group": base_group_name,
                             "original_size": (ts_width, ts_height)
-                        }
+                        })
                 else:
                     # Single image processing
-                    # Convert for better performance, but only if the image doesn't use alpha
-                    if "png" in path_lower or "gif" in path_lower:
-                        texture = orig_texture.convert_alpha()
-                    else:
-                        texture = orig_texture.convert()
+                    texture = orig_texture
+                    
+                    # Always scale the image to match the tile size for consistent proportions,
+                    # converted to the display format once
+                    scaled_texture = self._to_display_format(self._scale_to_tile(texture))
                     
                     # Try to match with a known tile type
                     tile_type = None
@@ -394,31 +627,29 @@ class StandaloneMapEditor:
                         self.asset_groups[base_group_name] = {
                             "category": category,
                             "tiles": [tile_type],
-                            "preview": texture
+                            "preview": scaled_texture
                         }
                     elif tile_type not in self.asset_groups[base_group_name]["tiles"]:
                         self.asset_groups[base_group_name]["tiles"].append(tile_type)
                     
                     # Get dimensions for original texture
                     orig_width, orig_height = texture.get_size()
-                    print(f"  Original size: {orig_width}x{orig_height}")
-                    
-                    # Always scale the image to match the tile size for consistent proportions
-                    scaled_texture = pygame.transform.scale(texture, (TILE_SIZE, TILE_SIZE))
+                    log.debug("  Original size: %dx%d", orig_width, orig_height)
                     
                     # Store the scaled image with original dimensions
-                    textures[category][tile_type] = {
+                    self._store_texture(textures[category], tile_type, {
                         "texture": scaled_texture,
+                        "sidebar": self._scale_to_tile(scaled_texture, SIDEBAR_PREVIEW_SIZE),
                         "path": filepath,
                         "is_sliced": False,
                         "group": base_group_name,
                         "original_size": (orig_width, orig_height)
-                    }
+                    })
                     
             except pygame.error as e:
-                print(f"  ⚠️ Error loading {filepath}: {e}")
+                log.warning("  ⚠️ Error loading %s: %s", filepath, e)
             except Exception as e:
-                print(f"  ⚠️ Error processing {filepath}: {e}")
+                log.warning("  ⚠️ Error processing %s: %s", filepath, e)
                 
                 # Add to group if it seems related to other tiles
                 base_group_name = name_without_ext.split('_')[0]
@@ -433,7 +664,7 @@ class StandaloneMapEditor:
                 
                 # Get dimensions for debugging
                 tex_width, tex_height = texture.get_size()
-                print(f"  Storing texture: {tile_type} ({tex_width}x{tex_height})")
+                log.debug("  Storing texture: %s (%dx%d)", tile_type, tex_width, tex_height)
                 
                 # Scale the texture to match the tile size - this ensures proportional art
                 if tex_width != TILE_SIZE or tex_height != TILE_SIZE:
@@ -441,18 +672,20 @@ class StandaloneMapEditor:
                     texture = scaled_texture
                 
                 # Store the texture with group information
-                textures[category][tile_type] = {
+                texture = self._to_display_format(texture)
+                self._store_texture(textures[category], tile_type, {
                     "texture": texture,
+                    "sidebar": self._scale_to_tile(texture, SIDEBAR_PREVIEW_SIZE),
                     "path": filepath,
                     "is_sliced": False,
                     "group": base_group_name,
                     "original_size": (tex_width, tex_height)
-                }
+                })
                 
         except pygame.error as e:
-            print(f"  ⚠️ Error loading {filepath}: {e}")
+            log.warning("  ⚠️ Error loading %s: %s", filepath, e)
         except Exception as e:
-            print(f"  ⚠️ Error processing {filepath}: {e}")
+            log.warning("  ⚠️ Error processing %s: %s", filepath, e)
 
     
     def initialize_new_map(self, width, height):
@@ -461,13 +694,168 @@ class StandaloneMapEditor:
             "name": "New Map",
             "width": width,
             "height": height,
-            "tile_size": TILE_SIZE,
-            "layers": {}
+            "tile_size": TILE_SIZE
         }
         
-        # Initialize empty layers
+        # Tile types are interned to small integer IDs (0 means empty)
+        self._tile_id_of = {}
+        self._tile_by_id = [None]
+        self._tex_by_id = [None]  # Display-ready texture per tile ID (None = use color)
+        self._tex_array = None  # _tex_by_id as a NumPy object array, built on demand
+        
+        # Initialize empty layers as grids of tile IDs indexed [y, x]
+        self.layer_arrays = {}
         for layer in self.map_layers:
-            self.map_data["layers"][layer] = {}
+            self.layer_arrays[layer] = np.zeros((height, width), dtype=np.int16)
+        
+        # Placed tiles per layer, so render can skip empty layers without scanning them
+        self._layer_counts = dict.fromkeys(self.map_layers, 0)
+        
+        # Each layer is pre-rendered into a map-sized surface, created on first use
+        self._cache_layers = width * height * TILE_SIZE * TILE_SIZE <= MAX_CACHED_MAP_PIXELS
+        self._layer_cache = {}
+        self._layer_cache_dirty = False
+    
+    def _intern_tile(self, tile):
+        """Return the ID of a TileType, registering it if new"""
+        key = (tile.source_category, tile.type)
+        tile_id = self._tile_id_of.get(key)
+        if tile_id is None:
+            tile_id = len(self._tile_by_id)
+            self._tile_id_of[key] = tile_id
+            self._tile_by_id.append(tile)
+            self._tex_by_id.append(self._lookup_texture(tile))
+            self._tex_array = None
+        return tile_id
+    
+    def _lookup_texture(self, tile):
+        """Find the texture for a TileType, or None if it has none"""
+        texture_info = self.textures.get(tile.source_category, {}).get(tile.type)
+        if not texture_info:
+            return None
+        return texture_info["texture"]
+    
+    def _rebuild_texture_table(self):
+        """Re-resolve the texture of every interned tile ID
+        The layer caches are only rebuilt when some placed tile type got a new texture.
+        """
+        tex_by_id = [None] + [self._lookup_texture(tile) for tile in self._tile_by_id[1:]]
+        if any(new is not old for new, old in zip(tex_by_id, self._tex_by_id)):
+            self._tex_by_id = tex_by_id
+            self._tex_array = None
+            self._layer_cache_dirty = True
+    
+    def _layer_surface(self, layer):
+        """Return the cached surface of a layer, creating a transparent one if needed"""
+        surface = self._layer_cache.get(layer)
+        if surface is None:
+            size = (self.map_data["width"] * TILE_SIZE, self.map_data["height"] * TILE_SIZE)
+            surface = pygame.Surface(size, SRCALPHA).convert_alpha()
+            surface.fill((0, 0, 0, 0))
+            self._layer_cache[layer] = surface
+        return surface
+    
+    def _texture_array(self):
+        """Return the per-ID texture table as a NumPy object array, for gathering by tile ID"""
+        if self._tex_array is None:
+            self._tex_array = np.empty(len(self._tex_by_id), dtype=object)
+            self._tex_array[:] = self._tex_by_id
+        return self._tex_array
+    
+    def _draw_tiles(self, surface, tile_ids, pixel_xs, pixel_ys):
+        """Draw tiles onto a surface, batching all textured tiles into one call
+        tile_ids, pixel_xs and pixel_ys are parallel NumPy arrays.
+        """
+        # Gather every tile's texture at once and split off the ones without
+        textures = self._texture_array()[tile_ids]
+        textured = np.not_equal(textures, None)
+        
+        # Use the texture if we have one
+        if textured.any():
+            positions = zip(pixel_xs[textured].tolist(), pixel_ys[textured].tolist())
+            blit_batch(surface, list(zip(textures[textured].tolist(), positions)))
+        
+        # Otherwise fall back to a color
+        untextured = ~textured
+        for tile_id, px, py in zip(tile_ids[untextured].tolist(), pixel_xs[untextured].tolist(),
+                                   pixel_ys[untextured].tolist()):
+            color = self.tile_colors.get(self._tile_by_id[tile_id].type, (200, 0, 200))
+            surface.fill(color, (px, py, TILE_SIZE, TILE_SIZE))
+    
+    def _ground_texture(self):
+        """Return the texture drawn under every map cell, or None if there is none"""
+        terrain = self.textures.get("terrain", {})
+        for tile_name in ["grass", "ground", "dirt"]:
+            if tile_name in terrain:
+                return terrain[tile_name]["texture"]
+        return None
+    
+    def _background_surface(self):
+        """Return the background (checker pattern plus ground texture), building it if needed
+        It covers the map view, rounded up to whole tiles, plus two more tiles across and
+        down, so blitting it at the camera offset modulo two tiles lines it up with the map,
+        keeps the checker parity and still reaches the view's right and bottom edges.
+        """
+        ground_texture = self._ground_texture()
+        if self._bg_surface is None or self._bg_ground is not ground_texture:
+            width = -(-(SCREEN_WIDTH - SIDEBAR_WIDTH) // TILE_SIZE) + 2
+            height = -(-SCREEN_HEIGHT // TILE_SIZE) + 2
+            surface = pygame.Surface((width * TILE_SIZE, height * TILE_SIZE)).convert()
+            
+            # Alternating grid pattern for visibility, tiled from a 2x2-tile block
+            period = 2 * TILE_SIZE
+            checker = pygame.Surface((period, period)).convert()
+            checker.fill((40, 40, 40))
+            checker.fill((35, 35, 35), (TILE_SIZE, 0, TILE_SIZE, TILE_SIZE))
+            checker.fill((35, 35, 35), (0, TILE_SIZE, TILE_SIZE, TILE_SIZE))
+            blit_batch(surface, [(checker, (x, y)) for x in range(0, width * TILE_SIZE, period)
+                                 for y in range(0, height * TILE_SIZE, period)])
+            
+            # Ground texture everywhere on top
+            if ground_texture:
+                blit_batch(surface, [(ground_texture, (x * TILE_SIZE, y * TILE_SIZE))
+                                     for x in range(width) for y in range(height)])
+            self._bg_surface = surface
+            self._bg_ground = ground_texture
+        return self._bg_surface
+    
+    def _build_grid_overlay(self):
+        """Draw the grid lines once onto a transparent surface one tile larger than the map view
+        Blitting it at the camera offset modulo TILE_SIZE lines it up with the map.
+        """
+        width, height = SCREEN_WIDTH - SIDEBAR_WIDTH + TILE_SIZE, SCREEN_HEIGHT + TILE_SIZE
+        colorkey = (255, 0, 255)
+        surface = pygame.Surface((width, height)).convert()
+        surface.fill(colorkey)
+        surface.set_colorkey(colorkey, RLEACCEL)
+        
+        for x in range(0, width, TILE_SIZE):
+            pygame.draw.line(surface, GRID_COLOR, (x, 0), (x, height))
+        for y in range(0, height, TILE_SIZE):
+            pygame.draw.line(surface, GRID_COLOR, (0, y), (width, y))
+        return surface
+    
+    def _rebuild_layer_cache(self):
+        """Pre-render every non-empty layer into its cached surface"""
+        self._layer_cache = {}
+        for layer, layer_arr in self.layer_arrays.items():
+            if self._layer_counts[layer]:
+                ys, xs = np.nonzero(layer_arr)
+                self._draw_tiles(self._layer_surface(layer), layer_arr[ys, xs], xs * TILE_SIZE, ys * TILE_SIZE)
+        self._layer_cache_dirty = False
+    
+    def _update_cached_cell(self, layer, x, y):
+        """Redraw a single edited cell of a layer's cached surface"""
+        if self._layer_cache_dirty or not self._cache_layers:
+            return  # The whole cache is rebuilt on the next frame anyway, or not used
+        
+        surface = self._layer_surface(layer)
+        px, py = x * TILE_SIZE, y * TILE_SIZE
+        surface.fill((0, 0, 0, 0), (px, py, TILE_SIZE, TILE_SIZE))
+        
+        tile_id = int(self.layer_arrays[layer][y, x])
+        if tile_id:
+            self._draw_tiles(surface, np.array([tile_id]), np.array([px]), np.array([py]))
     
     def run(self):
         """Main application loop"""
@@ -477,11 +865,21 @@ class StandaloneMapEditor:
             self.render()
             self.clock.tick(FPS)
         
+        # Stop the asset scan before shutting pygame down under it
+        self._stop_loading.set()
+        self._scan_thread.join()
         pygame.quit()
     
     def handle_events(self):
         """Handle pygame events"""
         for event in pygame.event.get():
+            # Mouse movement only changes the sidebar (tooltips); anything else may change the map
+            if event.type == MOUSEMOTION:
+                if event.pos[0] < SIDEBAR_WIDTH or event.pos[0] - event.rel[0] < SIDEBAR_WIDTH:
+                    self._sidebar_dirty = True
+            else:
+                self._map_dirty = True
+            
             if event.type == QUIT:
                 self.running = False
             
@@ -490,18 +888,20 @@ class StandaloneMapEditor:
             
             elif event.type == MOUSEBUTTONDOWN:
                 # Debug click position
-                x, y = event.pos
-                print(f"Mouse click at ({x}, {y}) with button {event.button}")
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug("Mouse click at %s with button %d", event.pos, event.button)
                 
                 # Mouse wheel scrolling for sidebar
                 if event.button == 4:  # Scroll up
                     if pygame.mouse.get_pos()[0] < SIDEBAR_WIDTH:
-                        self.sidebar_tile_scroll = max(0, self.sidebar_tile_scroll - 1)
-                        print(f"Scroll up: {self.sidebar_tile_scroll}")
+                        scroll = self.sidebar_tile_scroll - 1
+                        self.sidebar_tile_scroll = scroll if scroll > 0 else 0
+                        log.debug("Scroll up: %d", self.sidebar_tile_scroll)
                 elif event.button == 5:  # Scroll down
                     if pygame.mouse.get_pos()[0] < SIDEBAR_WIDTH:
-                        self.sidebar_tile_scroll = min(self.sidebar_tile_scroll_max, self.sidebar_tile_scroll + 1)
-                        print(f"Scroll down: {self.sidebar_tile_scroll}")
+                        scroll = self.sidebar_tile_scroll + 1
+                        self.sidebar_tile_scroll = scroll if scroll < self.sidebar_tile_scroll_max else self.sidebar_tile_scroll_max
+                        log.debug("Scroll down: %d", self.sidebar_tile_scroll)
                 else:
                     self.handle_mouse_click(event.pos, event.button)
     
@@ -515,13 +915,15 @@ class StandaloneMapEditor:
         elif key in [K_UP, K_w]:
             # If shift is held, scroll sidebar instead of camera
             if pygame.key.get_mods() & KMOD_SHIFT:
-                self.sidebar_tile_scroll = max(0, self.sidebar_tile_scroll - 1)
+                scroll = self.sidebar_tile_scroll - 1
+                self.sidebar_tile_scroll = scroll if scroll > 0 else 0
             else:
                 self.camera_y -= TILE_SIZE
         elif key in [K_DOWN, K_s]:
             # If shift is held, scroll sidebar instead of camera
             if pygame.key.get_mods() & KMOD_SHIFT:
-                self.sidebar_tile_scroll = min(self.sidebar_tile_scroll_max, self.sidebar_tile_scroll + 1)
+                scroll = self.sidebar_tile_scroll + 1
+                self.sidebar_tile_scroll = scroll if scroll < self.sidebar_tile_scroll_max else self.sidebar_tile_scroll_max
             else:
                 self.camera_y += TILE_SIZE
         
@@ -554,19 +956,19 @@ class StandaloneMapEditor:
         """Handle mouse input"""
         # Check if click is in sidebar
         if pos[0] < SIDEBAR_WIDTH:
-            print(f"Handling sidebar click at {pos}")
+            log.debug("Handling sidebar click at %s", pos)
             self.handle_sidebar_click(pos)
         else:
             # Place or remove tile on map
             map_x, map_y = self.screen_to_map(pos)
-            print(f"Map coordinates: ({map_x}, {map_y})")
+            log.debug("Map coordinates: (%d, %d)", map_x, map_y)
             
             if button == 1:  # Left click - place tile
                 if self.selected_tile:
-                    print(f"Attempting to place '{self.selected_tile}' at ({map_x}, {map_y})")
+                    log.debug("Attempting to place '%s' at (%d, %d)", self.selected_tile, map_x, map_y)
                     self.place_tile(map_x, map_y)
                 else:
-                    print("No tile selected for placement")
+                    log.debug("No tile selected for placement")
             elif button == 3:  # Right click - remove tile
                 self.remove_tile(map_x, map_y)
     
@@ -599,7 +1001,7 @@ class StandaloneMapEditor:
                     self.selected_tile = None
                     self.selected_tile_data = None
                 
-                print(f"Selected category: {category}, initial tile: {self.selected_tile}")
+                log.debug("Selected category: %s, initial tile: %s", category, self.selected_tile)
                 return
             
             category_y += 35
@@ -616,8 +1018,8 @@ class StandaloneMapEditor:
         # Calculate total rows needed and set max scroll
         total_tiles = len(self.categories[self.selected_category])
         visible_rows = (SCREEN_HEIGHT - tiles_y - 120) // tile_size
-        total_rows = math.ceil(total_tiles / tiles_per_row)
-        self.sidebar_tile_scroll_max = max(0, total_rows - visible_rows)
+        total_rows = -(-total_tiles // tiles_per_row)  # Integer ceiling division
+        self.sidebar_tile_scroll_max = total_rows - visible_rows if total_rows > visible_rows else 0
         
         # Check for scroll button clicks
         if total_tiles > visible_rows * tiles_per_row:
@@ -626,11 +1028,11 @@ class StandaloneMapEditor:
             
             if scroll_up_rect.collidepoint(pos) and self.sidebar_tile_scroll > 0:
                 self.sidebar_tile_scroll -= 1
-                print(f"Scrolling up: {self.sidebar_tile_scroll}")
+                log.debug("Scrolling up: %d", self.sidebar_tile_scroll)
                 return
             elif scroll_down_rect.collidepoint(pos) and self.sidebar_tile_scroll < self.sidebar_tile_scroll_max:
                 self.sidebar_tile_scroll += 1
-                print(f"Scrolling down: {self.sidebar_tile_scroll}")
+                log.debug("Scrolling down: %d", self.sidebar_tile_scroll)
                 return
         
         # Calculate visible tiles range based on scroll position
@@ -662,70 +1064,73 @@ class StandaloneMapEditor:
                 else:
                     self.selected_tile_data = None
                     
-                print(f"Selected tile: {tile} from category: {self.selected_category}")
+                log.debug("Selected tile: %s from category: %s", tile, self.selected_category)
                 return
     
     def place_tile(self, x, y):
         """Place the selected tile at the specified map position"""
         if x < 0 or y < 0 or x >= self.map_data["width"] or y >= self.map_data["height"]:
-            print(f"❌ Out of bounds: ({x}, {y})")
+            log.debug("Out of bounds: (%d, %d)", x, y)
             return
         
         if not self.selected_tile:  # Ensure a tile is selected
-            print("❌ No tile selected")
+            log.debug("No tile selected")
             return
         
-        print(f"Placing {self.selected_tile} at ({x}, {y}) on layer {self.current_layer}")
-        
-        # Create coordinate key
-        pos_key = f"{x},{y}"
+        log.debug("Placing %s at (%d, %d) on layer %s", self.selected_tile, x, y, self.current_layer)
         
-        # Enhanced tile data with precise texture info
-        tile_data = {
-            "type": self.selected_tile,
-            "x": x,
-            "y": y,
-            "layer": self.current_layer  # Explicitly store layer info
-        }
+        # Reuse the tile's ID if this tile type has been placed before
+        tile_id = self._tile_id_of.get((self.selected_category, self.selected_tile))
         
-        # Store critical information to ensure we can match the tile back to the texture dictionary
-        if self.selected_category in self.textures and self.selected_tile in self.textures[self.selected_category]:
-            try:
-                texture_info = self.textures[self.selected_category][self.selected_tile]
-                
-                # Don't store the actual texture object as it can cause issues
-                # Instead, store the metadata needed to find the texture again later
-                tile_data["path"] = texture_info.get("path", "")
-                tile_data["source_category"] = self.selected_category
-                
-                if "is_sliced" in texture_info:
-                    tile_data["is_sliced"] = texture_info["is_sliced"]
-                    tile_data["tileset_index"] = texture_info.get("tileset_index", 0)
-                
-                print(f"Stored path info for tile: {tile_data['path']}")
-            except Exception as e:
-                print(f"❌ Error storing tile metadata: {e}")
-        else:
-            print(f"⚠️ Warning: No texture found for {self.selected_tile} in {self.selected_category}")
+        if tile_id is None:
+            # Enhanced tile data with precise texture info
+            tile = TileType(self.selected_tile, self.selected_category)
+            
+            # Store critical information to ensure we can match the tile back to the texture dictionary
+            if self.selected_category in self.textures and self.selected_tile in self.textures[self.selected_category]:
+                try:
+                    texture_info = self.textures[self.selected_category][self.selected_tile]
+                    
+                    # Don't store the actual texture object as it can cause issues
+                    # Instead, store the metadata needed to find the texture again later
+                    tile.path = texture_info.get("path", "")
+                    
+                    if "is_sliced" in texture_info:
+                        tile.is_sliced = texture_info["is_sliced"]
+                        tile.tileset_index = texture_info.get("tileset_index", 0)
+                    
+                    log.debug("Stored path info for tile: %s", tile.path)
+                except Exception as e:
+                    log.warning("❌ Error storing tile metadata: %s", e)
+            else:
+                log.debug("No texture found for %s in %s", self.selected_tile, self.selected_category)
+            
+            tile_id = self._intern_tile(tile)
         
         # Add tile to the current layer
-        self.map_data["layers"][self.current_layer][pos_key] = tile_data
+        layer_arr = self.layer_arrays[self.current_layer]
+        if not layer_arr[y, x]:
+            self._layer_counts[self.current_layer] += 1
+        layer_arr[y, x] = tile_id
+        self._update_cached_cell(self.current_layer, x, y)
+        self._map_dirty = True
         
         # Debug info
-        print(f"✅ Placed tile '{self.selected_tile}' at ({x}, {y}) on layer '{self.current_layer}'")
+        log.debug("Placed tile '%s' at (%d, %d) on layer '%s'", self.selected_tile, x, y, self.current_layer)
     
     def remove_tile(self, x, y):
         """Remove a tile at the specified map position"""
         if x < 0 or y < 0 or x >= self.map_data["width"] or y >= self.map_data["height"]:
             return
         
-        # Create coordinate key
-        pos_key = f"{x},{y}"
-        
         # Remove tile from current layer if it exists
-        if pos_key in self.map_data["layers"][self.current_layer]:
-            del self.map_data["layers"][self.current_layer][pos_key]
-            print(f"Removed tile at ({x}, {y}) from layer '{self.current_layer}'")
+        layer_arr = self.layer_arrays[self.current_layer]
+        if layer_arr[y, x]:
+            layer_arr[y, x] = 0
+            self._layer_counts[self.current_layer] -= 1
+            self._update_cached_cell(self.current_layer, x, y)
+            self._map_dirty = True
+            log.debug("Removed tile at (%d, %d) from layer '%s'", x, y, self.current_layer)
     
     def screen_to_map(self, screen_pos):
         """Convert screen coordinates to map coordinates"""
@@ -733,8 +1138,12 @@ class StandaloneMapEditor:
         adjusted_x = screen_pos[0] - SIDEBAR_WIDTH
         
         # Convert to tile coordinates accounting for camera position
-        map_x = (adjusted_x + self.camera_x) // TILE_SIZE
-        map_y = (screen_pos[1] + self.camera_y) // TILE_SIZE
+        if TILE_SHIFT is not None:
+            map_x = (adjusted_x + self.camera_x) >> TILE_SHIFT
+            map_y = (screen_pos[1] + self.camera_y) >> TILE_SHIFT
+        else:
+            map_x = (adjusted_x + self.camera_x) // TILE_SIZE
+            map_y = (screen_pos[1] + self.camera_y) // TILE_SIZE
         
         return map_x, map_y
     
@@ -746,101 +1155,130 @@ class StandaloneMapEditor:
     
     def update(self):
         """Update game state"""
-        pass
+        if self.loading_assets:
+            self._register_loaded_assets()
     
     def render(self):
-        """Render the map editor interface"""
-        # Clear screen
-        self.screen.fill(BACKGROUND_COLOR)
-        
-        # Render map area
-        self.render_map()
+        """Render the map editor interface, redrawing only what changed since the last frame"""
+        if self._map_dirty or self.loading_assets:
+            # Clear screen
+            self.screen.fill(BACKGROUND_COLOR)
+            
+            # Render map area
+            self.render_map()
+            
+            # Render sidebar
+            self.render_sidebar()
+            
+            # Show asset loading progress
+            if self.loading_assets:
+                self.render_loading_bar()
+            
+            # Update display
+            pygame.display.flip()
         
-        # Render sidebar
-        self.render_sidebar()
+        elif self._sidebar_dirty:
+            # Only the sidebar changed; it draws its own background over the last frame
+            self.render_sidebar()
+            pygame.display.update(pygame.Rect(0, 0, SIDEBAR_WIDTH + 1, SCREEN_HEIGHT))
         
-        # Update display
-        pygame.display.flip()
+        self._map_dirty = self._sidebar_dirty = False
+    
+    def _text(self, font, text, color):
+        """Render a line of antialiased text, reusing the surface if it was rendered before"""
+        key = (id(font), text, color)
+        surface = self._text_cache.get(key)
+        if surface is None:
+            surface = font.render(text, True, color).convert_alpha()
+            self._text_cache[key] = surface
+        return surface
+    
+    def render_loading_bar(self):
+        """Render a progress bar for the background asset scan"""
+        bar_rect = pygame.Rect(SIDEBAR_WIDTH + 20, SCREEN_HEIGHT - 40, SCREEN_WIDTH - SIDEBAR_WIDTH - 40, 20)
+        pygame.draw.rect(self.screen, (30, 30, 30), bar_rect)
+        
+        # Fill in the loaded fraction (the total is unknown until the scan finishes walking)
+        if self.assets_total:
+            fill_rect = bar_rect.copy()
+            fill_rect.width = bar_rect.width * self.assets_loaded // self.assets_total
+            pygame.draw.rect(self.screen, (80, 160, 80), fill_rect)
+        pygame.draw.rect(self.screen, (200, 200, 200), bar_rect, 1)
+        
+        text = self.small_font.render(f"Loading assets... {self.assets_loaded}/{self.assets_total}", True, (255, 255, 255))
+        self.screen.blit(text, (bar_rect.x, bar_rect.y - 16))
     
     def render_map(self):
         """Render the map area"""
+        # Bind per-frame values to locals once
+        screen = self.screen
+        camera_x, camera_y = self.camera_x, self.camera_y
+        base_x, base_y = SIDEBAR_WIDTH - camera_x, -camera_y  # Screen position of map pixel (0, 0)
+        map_width, map_height = self.map_data["width"], self.map_data["height"]
+        cache_layers = self._cache_layers
+        
         # Map viewport background
         map_rect = pygame.Rect(SIDEBAR_WIDTH, 0, SCREEN_WIDTH - SIDEBAR_WIDTH, SCREEN_HEIGHT)
-        pygame.draw.rect(self.screen, (30, 30, 30), map_rect)
+        pygame.draw.rect(screen, (30, 30, 30), map_rect)
         
         # Calculate visible map area
-        start_x = max(0, self.camera_x // TILE_SIZE)
-        start_y = max(0, self.camera_y // TILE_SIZE)
-        end_x = min(self.map_data["width"], (self.camera_x + SCREEN_WIDTH - SIDEBAR_WIDTH) // TILE_SIZE + 1)
-        end_y = min(self.map_data["height"], (self.camera_y + SCREEN_HEIGHT) // TILE_SIZE + 1)
-        
-        # Draw the editor grid background for visual reference
-        for x in range(start_x, end_x):
-            for y in range(start_y, end_y):
-                screen_x, screen_y = self.map_to_screen((x, y))
-                # Draw alternating grid pattern for visibility
-                if (x + y) % 2 == 0:
-                    pygame.draw.rect(self.screen, (40, 40, 40), (screen_x, screen_y, TILE_SIZE, TILE_SIZE))
-                else:
-                    pygame.draw.rect(self.screen, (35, 35, 35), (screen_x, screen_y, TILE_SIZE, TILE_SIZE))
-        
-        # Draw base terrain layer first (always render grass or ground everywhere)
-        if "terrain" in self.textures and len(self.textures["terrain"]) > 0:
-            # Find a suitable ground texture
-            ground_texture = None
-            for tile_name in ["grass", "ground", "dirt"]:
-                if tile_name in self.textures["terrain"]:
-            
-            for x in range(start_x, end_x):
-                for y in range(start_y, end_y):
-                    screen_x, screen_y = self.map_to_screen((x, y))
-                    self.screen.blit(ground_texture, (screen_x, screen_y))
-    
-    # Render each layer
-    for layer in self.map_layers:
-        # Skip hidden layers
-        if layer in self.hidden_layers:
-            continue
+        start_x = max(0, camera_x // TILE_SIZE)
+        start_y = max(0, camera_y // TILE_SIZE)
+        end_x = max(0, min(map_width, (camera_x + SCREEN_WIDTH - SIDEBAR_WIDTH) // TILE_SIZE + 1))
+        end_y = max(0, min(map_height, (camera_y + SCREEN_HEIGHT) // TILE_SIZE + 1))
         
-        for pos_key, tile_data in self.map_data["layers"][layer].items():
-            try:
-                x, y = map(int, pos_key.split(","))
+        viewport = pygame.Rect(camera_x, camera_y, SCREEN_WIDTH - SIDEBAR_WIDTH, SCREEN_HEIGHT)
+        
+        # The checker background, base terrain and grid only cover the part of the map on screen
+        map_clip = pygame.Rect(base_x, base_y, map_width * TILE_SIZE, map_height * TILE_SIZE).clip(map_rect)
+        
+        # Draw the checker background and base terrain from the pre-composited surface
+        screen.set_clip(map_clip)
+        period = 2 * TILE_SIZE
+        screen.blit(self._background_surface(), (SIDEBAR_WIDTH - camera_x % period, -(camera_y % period)))
+        screen.set_clip(None)
+        
+        # Render each layer from its pre-rendered surface, one blit per layer
+        if cache_layers and self._layer_cache_dirty:
+            self._rebuild_layer_cache()
+        
+        hidden_layers = self.hidden_layers
+        layer_counts = self._layer_counts
+        current_layer = self.current_layer
+        for layer in self.map_layers:
+            # Skip hidden and empty layers
+            if layer in hidden_layers or not layer_counts[layer]:
+                continue
+            
+            if cache_layers:
+                layer_surface = self._layer_cache.get(layer)
+                if layer_surface is None:
+                    continue  # Nothing has been placed on this layer
                 
-                # Skip tiles outside the visible area
-                if x < start_x or x >= end_x or y < start_y or y >= end_y:
-                                else:
-                                    self.screen.blit(texture, (screen_x, screen_y))
-                                texture_drawn = True
-                            except Exception as e:
-                                pass
-                        
-                        # If no texture, use color
-                        if not texture_drawn:
-                            color = self.tile_colors.get(tile_type, (200, 0, 200))
-                            pygame.draw.rect(self.screen, color, (screen_x, screen_y, TILE_SIZE, TILE_SIZE))
-                        
-                        # Highlight current layer
-                        if layer == self.current_layer:
-                            pygame.draw.rect(self.screen, (255, 255, 255, 100), 
-                                            (screen_x, screen_y, TILE_SIZE, TILE_SIZE), 1)
-                except Exception as e:
-                    # Skip any tiles with parsing errors
-                    print(f"Error rendering tile: {e}")
+                screen.blit(layer_surface, (SIDEBAR_WIDTH, 0), viewport)
+                if layer != current_layer:
                     continue
+            
+            # Find the placed tiles in the visible slice of the layer
+            visible = self.layer_arrays[layer][start_y:end_y, start_x:end_x]
+            ys, xs = np.nonzero(visible)
+            screen_xs = (xs + start_x) * TILE_SIZE + base_x
+            screen_ys = (ys + start_y) * TILE_SIZE + base_y
+            
+            # Maps too large to cache draw just their visible tiles
+            if not cache_layers:
+                self._draw_tiles(screen, visible[ys, xs], screen_xs, screen_ys)
+            
+            # Highlight current layer
+            if layer == current_layer:
+                highlight = self._highlight_overlay
+                blit_batch(screen, [(highlight, pos) for pos in zip(screen_xs.tolist(), screen_ys.tolist())])
         
         # Render grid if enabled
         if self.grid_enabled:
-            for x in range(start_x, end_x):
-                screen_x = x * TILE_SIZE - self.camera_x + SIDEBAR_WIDTH
-                pygame.draw.line(self.screen, GRID_COLOR, 
-                                (screen_x, 0), 
-                                (screen_x, SCREEN_HEIGHT))
-            
-            for y in range(start_y, end_y):
-                screen_y = y * TILE_SIZE - self.camera_y
-                pygame.draw.line(self.screen, GRID_COLOR, 
-                                (SIDEBAR_WIDTH, screen_y), 
-                                (SCREEN_WIDTH, screen_y))
+            screen.set_clip(map_clip)
+            screen.blit(self._grid_overlay, (SIDEBAR_WIDTH - camera_x % TILE_SIZE, -(camera_y % TILE_SIZE)))
+            screen.set_clip(None)
     
     def render_sidebar(self):
         """Render the sidebar UI"""
@@ -849,16 +1287,16 @@ class StandaloneMapEditor:
         pygame.draw.line(self.screen, (100, 100, 100), (SIDEBAR_WIDTH-1, 0), (SIDEBAR_WIDTH-1, SCREEN_HEIGHT), 2)
         
         # Title
-        title_text = self.font.render("Trading Legends Map Editor", True, (255, 255, 255))
+        title_text = self._text(self.font, "Trading Legends Map Editor", (255, 255, 255))
         self.screen.blit(title_text, (10, 10))
         
         # Current map info
         map_info = f"Map: {self.map_data['name']} ({self.map_data['width']}x{self.map_data['height']})"
-        map_text = self.small_font.render(map_info, True, (200, 200, 200))
+        map_text = self._text(self.small_font, map_info, (200, 200, 200))
         self.screen.blit(map_text, (10, 35))
         
         # Current layer info
-        layer_text = self.small_font.render(f"Layer: {self.current_layer.upper()}", True, (200, 200, 200))
+        layer_text = self._text(self.small_font, f"Layer: {self.current_layer.upper()}", (200, 200, 200))
         self.screen.blit(layer_text, (10, 35 + self.small_font.get_height()))
         
         # Selected tile info with stronger visual feedback
@@ -868,25 +1306,18 @@ class StandaloneMapEditor:
             pygame.draw.rect(self.screen, (70, 70, 70), preview_rect)
             pygame.draw.rect(self.screen, (180, 180, 100), preview_rect, 2)  # Gold highlight
             
-            # Try to draw texture if available
-            texture_drawn = False
-            if self.selected_category in self.textures and self.selected_tile in self.textures[self.selected_category]:
-                try:
-                    texture = self.textures[self.selected_category][self.selected_tile]["texture"]
-                    # Scale to fit preview
-                    scaled_texture = pygame.transform.scale(texture, (36, 36))
-                    self.screen.blit(scaled_texture, (SIDEBAR_WIDTH - 48, 37))
-                    texture_drawn = True
-                except Exception as e:
-                    print(f"Error drawing selected tile preview: {e}")
+            # Draw the texture if available (pre-scaled to fit preview when loaded)
+            texture_info = self.textures.get(self.selected_category, {}).get(self.selected_tile)
+            if texture_info:
+                self.screen.blit(texture_info["sidebar"], (SIDEBAR_WIDTH - 48, 37))
             
             # Fall back to color if texture not available
-            if not texture_drawn:
+            else:
                 color = self.tile_colors.get(self.selected_tile, (200, 0, 200))
                 pygame.draw.rect(self.screen, color, (SIDEBAR_WIDTH - 48, 37, 36, 36))
             
             # Draw the name
-            selected_text = self.small_font.render(f"{self.selected_tile}", True, (220, 220, 100))
+            selected_text = self._text(self.small_font, f"{self.selected_tile}", (220, 220, 100))
             self.screen.blit(selected_text, (SIDEBAR_WIDTH - 60 - selected_text.get_width(), 45))
         
         # Category selection
@@ -899,7 +1330,7 @@ class StandaloneMapEditor:
             pygame.draw.rect(self.screen, bg_color, category_rect)
             pygame.draw.rect(self.screen, (100, 100, 100), category_rect, 1)
             
-            category_text = self.font.render(category.capitalize(), True, (255, 255, 255))
+            category_text = self._text(self.font, category.capitalize(), (255, 255, 255))
             self.screen.blit(category_text, (15, category_y + 5))
             
             category_y += 35
@@ -914,18 +1345,18 @@ class StandaloneMapEditor:
                 scroll_up_rect = pygame.Rect(SIDEBAR_WIDTH - 50, tiles_y - 25, 40, 25)
                 pygame.draw.rect(self.screen, (100, 100, 120), scroll_up_rect)
                 pygame.draw.rect(self.screen, (150, 150, 180), scroll_up_rect, 2)
-                up_text = self.font.render("▲", True, (230, 230, 230))
+                up_text = self._text(self.font, "▲", (230, 230, 230))
                 self.screen.blit(up_text, (scroll_up_rect.centerx - up_text.get_width()//2, scroll_up_rect.centery - up_text.get_height()//2))
                 
                 # Down button - make it larger and more visible
                 scroll_down_rect = pygame.Rect(SIDEBAR_WIDTH - 50, SCREEN_HEIGHT - 140, 40, 25)
                 pygame.draw.rect(self.screen, (100, 100, 120), scroll_down_rect)
                 pygame.draw.rect(self.screen, (150, 150, 180), scroll_down_rect, 2)
-                down_text = self.font.render("▼", True, (230, 230, 230))
+                down_text = self._text(self.font, "▼", (230, 230, 230))
                 self.screen.blit(down_text, (scroll_down_rect.centerx - down_text.get_width()//2, scroll_down_rect.centery - down_text.get_height()//2))
                     
                 # Show scroll position indicator
-                scroll_text = self.small_font.render(f"Page {self.sidebar_tile_scroll+1}/{self.sidebar_tile_scroll_max+1}", True, (180, 180, 180))
+                scroll_text = self._text(self.small_font, f"Page {self.sidebar_tile_scroll+1}/{self.sidebar_tile_scroll_max+1}", (180, 180, 180))
                 self.screen.blit(scroll_text, (10, tiles_y - 20))
             
             # Display tiles for current category
@@ -941,6 +1372,13 @@ class StandaloneMapEditor:
                 end_index = min(start_index + tiles_per_page, total_tiles)
                 visible_tiles = self.categories[self.selected_category][start_index:end_index]
                 
+                # Work out which tile the mouse is over, if any
+                mouse_x, mouse_y = pygame.mouse.get_pos()
+                hovered_index = -1
+                if 10 <= mouse_x < 10 + tiles_per_row * tile_size and mouse_y >= tiles_y:
+                    hovered_index = (mouse_y - tiles_y) // tile_size * tiles_per_row + (mouse_x - 10) // tile_size
+                
+                category_textures = self.textures.get(self.selected_category, {})
                 for i, tile in enumerate(visible_tiles):
                     row = i // tiles_per_row
                     col = i % tiles_per_row
@@ -957,31 +1395,22 @@ class StandaloneMapEditor:
                     bg_color = (90, 90, 90) if tile == self.selected_tile else (70, 70, 70)
                     pygame.draw.rect(self.screen, bg_color, tile_rect)
                     
-                    # Try to draw texture if available
-                    texture_drawn = False
-                    
-                    if self.selected_category in self.textures and tile in self.textures[self.selected_category]:
-                        try:
-                            texture = self.textures[self.selected_category][tile]["texture"]
-                            # Scale to fit preview
-                            scaled_texture = pygame.transform.scale(texture, (tile_size - 4, tile_size - 4))
-                            self.screen.blit(scaled_texture, (tile_x + 2, tile_y + 2))
-                            texture_drawn = True
-                        except:
-                            pass
+                    # Draw the texture if available (pre-scaled to fit preview when loaded)
+                    tile_info = category_textures.get(tile)
+                    if tile_info:
+                        self.screen.blit(tile_info["sidebar"], (tile_x + 2, tile_y + 2))
                     
-                    # Fall back to color if texture not available or fails
-                    if not texture_drawn:
+                    # Fall back to color if texture not available
+                    else:
                         color = self.tile_colors.get(tile, (200, 0, 200))
                         pygame.draw.rect(self.screen, color, (tile_x + 2, tile_y + 2, tile_size - 4, tile_size - 4))
                     
                     pygame.draw.rect(self.screen, (100, 100, 100), tile_rect, 1)
                     
                     # Draw tile name on hover
-                    mouse_pos = pygame.mouse.get_pos()
-                    if tile_rect.collidepoint(mouse_pos):
+                    if i == hovered_index:
                         # Draw tooltip with tile name
-                        name_text = self.small_font.render(tile, True, (255, 255, 255))
+                        name_text = self._text(self.small_font, tile, (255, 255, 255))
                         
                         # Add extra info about the tile if available
                         texture_info = ""
@@ -994,7 +1423,7 @@ class StandaloneMapEditor:
                         
                         # If we have texture info, add a second line
                         if texture_info:
-                            info_text = self.small_font.render(texture_info, True, (200, 200, 200))
+                            info_text = self._text(self.small_font, texture_info, (200, 200, 200))
                             tooltip_width = max(name_text.get_width(), info_text.get_width()) + 10
                             tooltip_height = name_text.get_height() + info_text.get_height() + 10
                         else:
@@ -1030,21 +1459,30 @@ class StandaloneMapEditor:
         ]
         
         for i, control in enumerate(controls):
-            control_text = self.small_font.render(control, True, (200, 200, 200))
+            control_text = self._text(self.small_font, control, (200, 200, 200))
             self.screen.blit(control_text, (10, controls_y + i * 15))
     
-    def save_map(self):
-        """Save the current map to a JSON file"""
+    def save_map(self, pretty=True):
+        """Save the current map to a JSON file
+        The layer grids are written next to it as a compressed .npz file.
+        pretty=False skips indenting the JSON, for quick saves such as autosaves.
+        """
         # Ensure maps directory exists
         maps_dir = os.path.join(os.getcwd(), "maps")
         os.makedirs(maps_dir, exist_ok=True)
         
         # Generate filename from map name
-        filename = os.path.join(maps_dir, f"{self.map_data['name'].replace(' ', '_').lower()}.json")
+        base_name = self.map_data['name'].replace(' ', '_').lower()
+        filename = os.path.join(maps_dir, f"{base_name}.json")
+        
+        # Save the layer grids, then the metadata with the tile ID table
+        np.savez_compressed(os.path.join(maps_dir, f"{base_name}.npz"), **self.layer_arrays)
         
-        # Save map data
-        with open(filename, 'w') as f:
-            json.dump(self.map_data, f, indent=2)
+        map_data = dict(self.map_data,
+                        layers_file=f"{base_name}.npz",
+                        tile_types=[tile.to_dict() for tile in self._tile_by_id[1:]])
+        with open(filename, 'wb') as f:
+            f.write(dump_json(map_data, pretty))
             
         print(f"✅ Map saved to {filename}")
     
@@ -1058,7 +1496,9 @@ class StandaloneMapEditor:
             return
         
         # List available maps
-        map_files = [f for f in os.listdir(maps_dir) if f.endswith('.json')]
+        with os.scandir(maps_dir) as entries:
+            map_entries = [entry for entry in entries if entry.name.endswith('.json') and entry.is_file()]
+        map_files = [entry.name for entry in map_entries]
         
         if not map_files:
             print("❌ No map files found in maps directory")
@@ -1071,9 +1511,63 @@ class StandaloneMapEditor:
         # For now, just load the first map
         if map_files:
             try:
-                map_path = os.path.join(maps_dir, map_files[0])
-                with open(map_path, 'r') as f:
-                    self.map_data = json.load(f)
+                map_path = map_entries[0].path
+                
+                with open(map_path, 'rb') as f:
+                    map_data = load_json(f.read())
+                
+                # Build the ID table and layer grids aside, so a bad file leaves the current map intact
+                width, height = map_data["width"], map_data["height"]
+                tile_id_of = {}
+                tile_by_id = [None]
+                
+                def intern(tile):
+                    key = (tile.source_category, tile.type)
+                    if key not in tile_id_of:
+                        tile_id_of[key] = len(tile_by_id)
+                        tile_by_id.append(tile)
+                    return tile_id_of[key]
+                
+                layer_arrays = {layer: np.zeros((height, width), dtype=np.int16) for layer in self.map_layers}
+                
+                if "layers_file" in map_data:
+                    # Map the saved tile IDs onto the new ID table
+                    id_map = np.zeros(len(map_data["tile_types"]) + 1, dtype=np.int16)
+                    for saved_id, tile_data in enumerate(map_data["tile_types"], start=1):
+                        id_map[saved_id] = intern(TileType.from_dict(tile_data))
+                    
+                    with np.load(os.path.join(maps_dir, map_data["layers_file"])) as saved_layers:
+                        for layer in layer_arrays:
+                            if layer in saved_layers:
+                                layer_arrays[layer] = id_map[saved_layers[layer]]
+                
+                # Older map files store every tile in a {"x,y": tile_data} dict
+                for layer, tiles in map_data.get("layers", {}).items():
+                    if layer not in layer_arrays:
+                        continue
+                    xs, ys, tile_ids = [], [], []
+                    for tile_data in tiles.values():
+                        # Look up by (category, type) tuple; only build a TileType the first time
+                        tile_id = tile_id_of.get((tile_data.get("source_category"), tile_data["type"]))
+                        if tile_id is None:
+                            tile_id = intern(TileType.from_dict(tile_data))
+                        xs.append(tile_data["x"])
+                        ys.append(tile_data["y"])
+                        tile_ids.append(tile_id)
+                    
+                    # Fill the grid in one go rather than cell by cell
+                    layer_arrays[layer][ys, xs] = tile_ids
+                
+                # Everything loaded; replace the current map
+                self.initialize_new_map(width, height)
+                self.map_data["name"] = map_data.get("name", self.map_data["name"])
+                self._tile_id_of = tile_id_of
+                self._tile_by_id = tile_by_id
+                self._tex_by_id = [None] + [self._lookup_texture(tile) for tile in tile_by_id[1:]]
+                self.layer_arrays = layer_arrays
+                for layer, layer_arr in layer_arrays.items():
+                    self._layer_counts[layer] = np.count_nonzero(layer_arr)
+                self._layer_cache_dirty = True
                 print(f"✅ Loaded map from {map_path}")
             except Exception as e:
                 print(f"❌ Error loading map: {e}")
@@ -14,14 +14,12 @@ print("Set SDL_VIDEODRIVER to cocoa for Mac")
 try:
     print("Starting map editor initialization...")
     # Import and run the map editor
-    import map_editor_main
+    from map_editor_main import StandaloneMapEditor
     print("Imported map editor module")
     
     # Explicitly create an instance and run it
     print("Creating editor instance...")
-    from map_editor_main import StandaloneMapEditorCore, SUBCATEGORIES
-    print("Creating editor with asset categories from previous implementation...")
-    editor = StandaloneMapEditorCore(SUBCATEGORIES, {})
+    editor = StandaloneMapEditor()
     print("Starting editor main loop...")
     editor.run()
     